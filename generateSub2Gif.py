@@ -1,8 +1,32 @@
-import whisper
+import argparse
+import ctranslate2
+import functools
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 import subprocess
 import os
 import sys
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+# Files this script writes next to each input video.
+OUTPUT_EXTENSIONS = (".srt", ".ass", ".gif")
+
+# Same defaults FFmpeg uses when converting SRT to ASS, with the subtitle style baked in.
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 384
+PlayResY: 288
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,40,&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,1,2,10,10,100,0
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
 
 def srt_timestamp(seconds: float) -> str:
     """
@@ -14,16 +38,66 @@ def srt_timestamp(seconds: float) -> str:
     Returns:
         The SRT timestamp string.
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int(round((seconds - int(seconds)) * 1000))
+    millis = int(seconds * 1000 + 0.5)
+    secs, millis = divmod(millis, 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
 
-def load_whisper_model(model_size: str = "small") -> whisper.Whisper:
+def ass_timestamp(seconds: float) -> str:
     """
-    Loads the Whisper model.
+    Converts fractional seconds into ASS's H:MM:SS.cc format.
+
+    Args:
+        seconds: The time in seconds (float).
+
+    Returns:
+        The ASS timestamp string.
+    """
+    centis = int(seconds * 100 + 0.5)
+    secs, centis = divmod(centis, 100)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def cuda_available() -> bool:
+    """
+    Checks whether a CUDA device is usable by CTranslate2.
+
+    Returns:
+        True if at least one CUDA device is available, False otherwise.
+    """
+    return ctranslate2.get_cuda_device_count() > 0
+
+
+def select_compute_device() -> Tuple[str, str]:
+    """
+    Selects the device and compute type for the Whisper model.
+
+    CUDA is used with float16 when the GPU supports it (compute capability 7.0+),
+    otherwise with int8 on older GPUs. Without a usable GPU the model runs in int8
+    on the CPU.
+
+    Returns:
+        The device and compute type.
+    """
+    if cuda_available():
+        supported = ctranslate2.get_supported_compute_types("cuda")
+        for compute_type in ("float16", "int8_float32", "int8"):
+            if compute_type in supported:
+                return "cuda", compute_type
+    return "cpu", "int8"
+
+
+@functools.lru_cache(maxsize=2)
+def load_whisper_model(model_size: str = "small") -> BatchedInferencePipeline:
+    """
+    Loads the Whisper model using the CTranslate2 backend, wrapped in a batched
+    inference pipeline. The model runs on CUDA when available, in FP16 if the GPU
+    supports it and in int8 otherwise, and falls back to int8 on the CPU. Loaded
+    models are cached per model size.
 
     Args:
         model_size: The size of the Whisper model to load (e.g., "small", "medium", "large").
@@ -31,177 +105,325 @@ def load_whisper_model(model_size: str = "small") -> whisper.Whisper:
     Returns:
         The loaded Whisper model.
     """
-    print(f"Loading Whisper model: {model_size}")
-    return whisper.load_model(model_size)
+    device, compute_type = select_compute_device()
+    print(f"Loading Whisper model: {model_size} ({device}, {compute_type})")
+    model = WhisperModel(model_size, device=device, compute_type=compute_type)
+    return BatchedInferencePipeline(model=model)
 
 
-def transcribe_video(model: whisper.Whisper, input_video: str) -> Dict:
+def transcribe_video(model: BatchedInferencePipeline, input_video: str) -> Dict:
     """
     Transcribes the audio from a video file using the Whisper model.
 
+    The audio is split into speech chunks by VAD, which are then decoded in batches.
+
     Args:
         model: The loaded Whisper model.
         input_video: The path to the video file.
 
     Returns:
-        The transcription result as a dictionary.
+        The transcription result as a dictionary. Its "segments" entry is a lazy
+        iterator: segments are transcribed as they are consumed, and it can only be
+        consumed once.
     """
-    print(f"Transcribing video: {input_video}")
-    return model.transcribe(input_video)
-
-
-def generate_word_by_word_srt(transcription_result: Dict, srt_file_path: str) -> None:
+    print(f"Starting transcription of video: {input_video}")
+    segments, _ = model.transcribe(
+        input_video,
+        batch_size=16,
+        word_timestamps=True,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=100),
+    )
+    return {
+        "segments": (
+            {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "words": [
+                    {"start": word.start, "end": word.end, "word": word.word}
+                    for word in segment.words or []
+                ],
+            }
+            for segment in segments
+        )
+    }
+
+
+def generate_word_by_word_subtitles(
+    transcription_result: Dict, srt_file_path: str, ass_file_path: str
+) -> None:
     """
-    Generates an SRT file with word-by-word timestamps.
+    Generates SRT and ASS files with word-by-word timestamps.
+
+    Each word is timed with the word-level timestamps reported by Whisper. Cues are
+    written while the transcription is still running. The ASS file carries the
+    subtitle style in its header and is what gets burned into the GIF.
 
     Args:
         transcription_result: The transcription result from Whisper.
         srt_file_path: The path to save the SRT file.
+        ass_file_path: The path to save the ASS file.
     """
-    print(f"Generating word-by-word SRT file: {srt_file_path}")
-    srt_lines: List[str] = []
+    print(f"Transcribing and generating word-by-word subtitles: {srt_file_path}, {ass_file_path}")
+    srt_ts = srt_timestamp
+    ass_ts = ass_timestamp
     cue_index = 1
 
-    for segment in transcription_result["segments"]:
-        segment_start = segment["start"]
-        segment_end = segment["end"]
-        text = segment["text"].strip()
+    with open(srt_file_path, "w", encoding="utf-8") as srt_file, \
+            open(ass_file_path, "w", encoding="utf-8") as ass_file:
+        write_srt = srt_file.write
+        write_ass = ass_file.write
+        write_ass(ASS_HEADER)
+        for segment in transcription_result["segments"]:
+            for word in segment["words"]:
+                text = word["word"].strip()
+                if not text:
+                    continue
 
-        words = text.split()
-        if not words:
-            continue
+                start, end = word["start"], word["end"]
+                write_srt(f"{cue_index}\n{srt_ts(start)} --> {srt_ts(end)}\n{text}\n\n")
 
-        segment_duration = segment_end - segment_start
-        word_duration = segment_duration / len(words)
+                ass_text = text.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}")
+                write_ass(f"Dialogue: 0,{ass_ts(start)},{ass_ts(end)},Default,,0,0,0,,{ass_text}\n")
+                cue_index += 1
+    print(f"Done transcribing and writing subtitles {srt_file_path}, {ass_file_path}")
 
-        for i, word in enumerate(words):
-            word_start = segment_start + i * word_duration
-            word_end = segment_start + (i + 1) * word_duration
 
-            start_str = srt_timestamp(word_start)
-            end_str = srt_timestamp(word_end)
+@functools.lru_cache(maxsize=None)
+def ffmpeg_cuda_available() -> bool:
+    """
+    Checks whether FFmpeg was built with CUDA hardware decoding and can open a CUDA device.
 
-            srt_lines.append(str(cue_index))
-            srt_lines.append(f"{start_str} --> {end_str}")
-            srt_lines.append(word)
-            srt_lines.append("")  # Blank line
-            cue_index += 1
+    Returns:
+        True if FFmpeg can decode with -hwaccel cuda, False otherwise.
+    """
+    try:
+        hwaccels = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-hwaccels"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        if "cuda" not in hwaccels:
+            return False
+        subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-init_hw_device", "cuda",
+                "-f", "lavfi", "-i", "nullsrc=s=16x16",
+                "-frames:v", "1",
+                "-f", "null", "-"
+            ],
+            check=True,
+            capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+
+def escape_filter_path(path: str) -> str:
+    """
+    Escapes a file path for use as a filter option inside an FFmpeg filtergraph.
 
-    with open(srt_file_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(srt_lines))
-    print(f"Done writing SRT {srt_file_path}")
+    Args:
+        path: The file path.
+
+    Returns:
+        The escaped path.
+    """
+    # Escape the path as a filter option value first...
+    for char in "\\':":
+        path = path.replace(char, "\\" + char)
+    # ...then escape that value again for the filtergraph it is embedded in.
+    for char in "\\'[],;":
+        path = path.replace(char, "\\" + char)
+    return path
 
 
-def burn_subtitles(input_video: str, srt_file_path: str, output_video_path: str) -> None:
+def create_gif(input_video: str, ass_file_path: str, gif_file_path: str) -> None:
     """
-    Burns the subtitles from an SRT file into a video using FFmpeg.
+    Burns the subtitles into the video and converts it to an animated GIF in a
+    single FFmpeg pass, generating the palette from the same decoded frames.
+    The input is decoded on the GPU when FFmpeg supports CUDA decoding.
 
     Args:
         input_video: The path to the input video.
-        srt_file_path: The path to the SRT file.
-        output_video_path: The path to save the output video with subtitles.
+        ass_file_path: The path to the ASS file.
+        gif_file_path: The path to save the GIF.
     """
-    print(f"Burning subtitles into video: {output_video_path}")
+    print(f"Burning subtitles and converting to animated GIF: {gif_file_path}")
 
     ffmpeg_filter = (
-        f"subtitles={srt_file_path}:force_style=" # Corrected line
-        f"'Alignment=2,FontSize=40,MarginV=100,"
-        f"PrimaryColour=&H00FFFFFF,"  # added white text
-        f"OutlineColour=&H00000000,"  # added black outline
-        f"Outline=2,"  # added outline thickness
-        f"Shadow=1'" # removed shadow
+        # Downscale first so the subtitles are rendered at GIF resolution.
+        f"[0:v]fps=10,scale=320:-1:flags=lanczos,"
+        f"ass={escape_filter_path(ass_file_path)},split[a][b];"
+        f"[a]palettegen[p];"
+        f"[b][p]paletteuse"
     )
 
+    # Decode on the GPU; frames are downloaded automatically for the CPU filters, and
+    # FFmpeg falls back to software decoding for codecs the GPU cannot handle.
+    hwaccel = ["-hwaccel", "cuda"] if ffmpeg_cuda_available() else []
+
     command = [
         "ffmpeg",
         "-y",  # Overwrite without asking
+        "-loglevel", "error",
+        "-nostats",  # No per-frame progress output
+        *hwaccel,
         "-i", input_video,
-        "-vf", ffmpeg_filter,
-        output_video_path
+        "-filter_complex", ffmpeg_filter,
+        gif_file_path
     ]
 
-    subprocess.run(command, check=True)
-    print(f"Done burning subtitles into {output_video_path}")
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    print(f"Done converting to GIF {gif_file_path}")
 
 
-def generate_palette(output_video_path: str, palette_file_path: str) -> None:
+def check_output_collisions(input_videos: List[str]) -> None:
     """
-    Generates a color palette for the GIF.
+    Checks that no two input videos write to the same output files.
 
     Args:
-        output_video_path: The path to the video used to generate the palette.
-        palette_file_path: The path to save the palette file.
-    """
-    print(f"Generating palette for GIF: {palette_file_path}")
-    command_palette = [
-        "ffmpeg",
-        "-y",
-        "-i", output_video_path,
-        "-vf", "fps=10,scale=320:-1:flags=lanczos,palettegen",
-        palette_file_path
-    ]
+        input_videos: The paths to the input video files.
 
-    subprocess.run(command_palette, check=True)
-    print(f"Done generating palette {palette_file_path}")
+    Raises:
+        ValueError: If two input videos would write to the same output files.
+    """
+    base_names = {}
+    for input_video in input_videos:
+        base_name = os.path.normcase(os.path.abspath(os.path.splitext(input_video)[0]))
+        if base_name in base_names:
+            raise ValueError(
+                f"{base_names[base_name]} and {input_video} would both write "
+                f"to {os.path.splitext(input_video)[0]}{{{','.join(OUTPUT_EXTENSIONS)}}}"
+            )
+        base_names[base_name] = input_video
 
 
-def convert_to_gif(output_video_path: str, palette_file_path: str, gif_file_path: str) -> None:
+def process_video(input_video: str) -> None:
     """
-    Converts the video to an animated GIF using the generated palette.
+    Processes the input video to generate a GIF with subtitles.
 
     Args:
-        output_video_path: The path to the video.
-        palette_file_path: The path to the palette file.
-        gif_file_path: The path to save the GIF.
-    """
-    print(f"Converting to animated GIF: {gif_file_path}")
-    command_gif = [
-        "ffmpeg",
-        "-y",
-        "-i", output_video_path,
-        "-i", palette_file_path,
-        "-lavfi", "fps=10,scale=320:-1:flags=lanczos,paletteuse",
-        gif_file_path
-    ]
+        input_video: The path to the input video file.
 
-    subprocess.run(command_gif, check=True)
-    print(f"Done converting to GIF {gif_file_path}")
+    Raises:
+        RuntimeError: If the video could not be transcribed or converted to a GIF.
+    """
+    process_videos([input_video])
 
 
-def process_video(input_video: str) -> None:
+def process_videos(input_videos: List[str]) -> None:
     """
-    Processes the input video to generate a GIF with subtitles.
+    Processes the input videos to generate GIFs with subtitles.
+
+    The Whisper model is loaded once for all videos. Each GIF is rendered by FFmpeg
+    in a worker thread while the next video is being transcribed. A failure on one
+    video is reported and the remaining videos are still processed.
 
     Args:
-        input_video: The path to the input video file.
-    """
-    base_name = os.path.splitext(input_video)[0]
-    srt_file_path = f"{base_name}.srt"
-    output_video_path = f"{base_name}_output.mp4"
-    palette_file_path = f"{base_name}_palette.png"
-    gif_file_path = f"{base_name}.gif"
+        input_videos: The paths to the input video files.
 
+    Raises:
+        ValueError: If two input videos would write to the same output files.
+        RuntimeError: If any of the videos could not be processed.
+    """
+    check_output_collisions(input_videos)
     model = load_whisper_model()
-    transcription_result = transcribe_video(model, input_video)
-    generate_word_by_word_srt(transcription_result, srt_file_path)
-    burn_subtitles(input_video, srt_file_path, output_video_path)
-    generate_palette(output_video_path, palette_file_path)
-    convert_to_gif(output_video_path, palette_file_path, gif_file_path)
 
-    print(f"Done! Animated GIF saved as {gif_file_path}")
+    failed = []
+    # FFmpeg and CTranslate2 are both multi-threaded, so a single render worker is
+    # enough to overlap rendering with transcription without oversubscribing the CPU.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures = {}
+        for input_video in input_videos:
+            base_name = os.path.splitext(input_video)[0]
+            srt_file_path = f"{base_name}.srt"
+            ass_file_path = f"{base_name}.ass"
+            gif_file_path = f"{base_name}.gif"
+
+            try:
+                transcription_result = transcribe_video(model, input_video)
+                generate_word_by_word_subtitles(transcription_result, srt_file_path, ass_file_path)
+            except Exception as e:
+                print(f"Failed to transcribe {input_video}: {e}")
+                failed.append(input_video)
+                continue
+            futures[input_video] = executor.submit(
+                create_gif, input_video, ass_file_path, gif_file_path
+            )
+
+        for input_video, future in futures.items():
+            gif_file_path = f"{os.path.splitext(input_video)[0]}.gif"
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Failed to create GIF {gif_file_path}: {e}")
+                failed.append(input_video)
+            else:
+                print(f"Done! Animated GIF saved as {gif_file_path}")
+
+    if failed:
+        raise RuntimeError(f"Failed to process {len(failed)} video(s): {', '.join(failed)}")
+
+
+def collect_input_videos(patterns: List[str]) -> List[str]:
+    """
+    Expands glob patterns into a list of input videos.
+
+    Duplicate paths are dropped, as are files with an extension this script writes
+    itself, so the outputs of a previous run are not processed again.
+
+    Args:
+        patterns: Paths or glob patterns of the input videos.
+
+    Returns:
+        The paths to the input video files.
+    """
+    input_videos = []
+    seen = set()
+    for pattern in patterns:
+        for input_video in sorted(glob.glob(pattern)) or [pattern]:
+            if input_video.lower().endswith(OUTPUT_EXTENSIONS):
+                print(f"Skipping {input_video}: it has the extension of a generated file")
+                continue
+            key = os.path.normcase(os.path.abspath(input_video))
+            if key not in seen:
+                seen.add(key)
+                input_videos.append(input_video)
+    return input_videos
 
 
 def main():
     """
     Main function to process the command-line arguments and start the video processing.
     """
-    if len(sys.argv) != 2:
-        print("Usage: python generateSub2Gif.py <input_video>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Generate animated GIFs with word-by-word subtitles from videos."
+    )
+    parser.add_argument(
+        "input_videos",
+        nargs="+",
+        metavar="input_video",
+        help="Path or glob pattern of the input video(s)",
+    )
+    args = parser.parse_args()
 
-    input_video = sys.argv[1]
-    process_video(input_video)
+    input_videos = collect_input_videos(args.input_videos)
+    if not input_videos:
+        parser.error("no input videos to process")
+    try:
+        check_output_collisions(input_videos)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        process_videos(input_videos)
+    except RuntimeError as e:
+        sys.exit(str(e))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()